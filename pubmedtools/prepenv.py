@@ -16,10 +16,18 @@ Author: Diogo de J. S. Machado
 Date: 14/07/2023
 """
 import os
+import io
 import gzip
 import zipfile
 import urllib.request
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+def _download(url):
+    """
+    Downloads the file at the given URL and returns its contents.
+    """
+    with urllib.request.urlopen(url) as resp:
+        return resp.read()
 
 def edirect_folder():
     """
@@ -39,43 +47,36 @@ def edirect_folder():
     if not os.path.exists(os.path.join(edirect_path, "esearch")):
         print("Downloading and extracting edirect...")
 
-        # Download the edirect ZIP file
+        # Download the edirect ZIP file and xtract.Linux.gz in parallel, into
+        # memory, without writing the compressed files to disk
         edirect_url = "https://ftp.ncbi.nlm.nih.gov/entrez/entrezdirect/edirect.zip"
-        edirect_zip_path = os.path.join(edirect_path, "edirect.zip")
-        urllib.request.urlretrieve(edirect_url, edirect_zip_path)
+        xtract_url = "https://ftp.ncbi.nlm.nih.gov/entrez/entrezdirect/xtract.Linux.gz"
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            edirect_future = executor.submit(_download, edirect_url)
+            xtract_future = executor.submit(_download, xtract_url)
+            edirect_zip = edirect_future.result()
+            xtract_gz = xtract_future.result()
 
         # Extract the contents of the edirect ZIP file
-        with zipfile.ZipFile(edirect_zip_path, "r") as zip_ref:
+        with zipfile.ZipFile(io.BytesIO(edirect_zip), "r") as zip_ref:
             zip_ref.extractall(edirect_path)
 
         # Get the extracted edirect directory
         edirect_extracted_dir = os.path.join(edirect_path, "edirect")
 
-        # Get the list of files in the extracted directory
-        files = os.listdir(edirect_extracted_dir)
+        # Move each file to the edirect folder. Both folders are on the same
+        # filesystem, so a rename is enough
+        with os.scandir(edirect_extracted_dir) as entries:
+            for entry in entries:
+                os.replace(entry.path, os.path.join(edirect_path, entry.name))
 
-        # Move each file to the edirect folder
-        for f in files:
-            origin_path = os.path.join(edirect_extracted_dir, f)
-            dest_path = os.path.join(edirect_path, f)
-            shutil.move(origin_path, dest_path)
-
-        # Remove the edirect ZIP file and the extracted directory
-        os.remove(edirect_zip_path)
+        # Remove the extracted directory
         os.rmdir(edirect_extracted_dir)
 
-        # Download xtract.Linux.gz
-        xtract_url = "https://ftp.ncbi.nlm.nih.gov/entrez/entrezdirect/xtract.Linux.gz"
-        xtract_gz_path = os.path.join(edirect_path, "xtract.Linux.gz")
-        urllib.request.urlretrieve(xtract_url, xtract_gz_path)
-
-        # Extract xtract.Linux.gz
-        with gzip.open(xtract_gz_path, "rb") as f_in:
-            with open(os.path.join(edirect_path, "xtract"), "wb") as f_out:
-                shutil.copyfileobj(f_in, f_out)
-
-        # Remove xtract.Linux.gz
-        os.remove(xtract_gz_path)
+        # Extract xtract.Linux.gz, after the edirect files so that it replaces
+        # the xtract file from the ZIP
+        with open(os.path.join(edirect_path, "xtract"), "wb") as f_out:
+            f_out.write(gzip.decompress(xtract_gz))
 
         print("EDirect ready!")
     else:
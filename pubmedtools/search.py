@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 This module provides functions for searching and retrieving articles from the
-PubMed database using Biopython and NCBI Entrez Direct.
+PubMed database using the NCBI E-utilities API and NCBI Entrez Direct.
 The pubmedtools is not an official NCBI library and has no direct affiliation
 with the organization.
 
@@ -10,8 +10,8 @@ Functions:
 - biopython_search: Searches the PubMed database using a given term and
 retrieves article information such as abstract, title, publication date,
 authors, MeSH terms, and other terms related to each article. This function
-uses the Bio.Entrez package from Biopython. Please note that this function
-has a limitation of retrieving a maximum of 10,000 results.
+uses the NCBI E-utilities API directly. Please note that this function has a
+limitation of retrieving a maximum of 10,000 results.
 - edirect_search: Searches the PubMed database using a given term and
 retrieves article information such as abstract, title, publication date,
 authors, MeSH terms, and other terms related to each article. This function
@@ -22,20 +22,436 @@ Author: Diogo de J. S. Machado
 Date: 14/07/2023
 """
 import re
-from Bio import Entrez, Medline
+import threading
 import time
-import pandas as pd
-from io import StringIO
+import hashlib
+import tempfile
+import json
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import platform
 import os
 import subprocess
-    
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+EUTILS_URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils/'
+ESEARCH_URL = EUTILS_URL + 'esearch.fcgi'
+EFETCH_URL = EUTILS_URL + 'efetch.fcgi'
+ESUMMARY_URL = EUTILS_URL + 'esummary.fcgi'
+
+def _default_cache_path():
+    """
+    Returns the folder of the on-disk cache: the PUBMEDTOOLS_CACHE environment
+    variable if it is set, or a pubmedtools folder in the cache folder of the
+    user.
+    """
+    if os.environ.get('PUBMEDTOOLS_CACHE'):
+        return os.environ['PUBMEDTOOLS_CACHE']
+    if platform.system() == 'Windows':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif platform.system() == 'Darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = (os.environ.get('XDG_CACHE_HOME')
+                or os.path.expanduser('~/.cache'))
+    return os.path.join(base, 'pubmedtools')
+
+# On-disk cache of downloaded data, one file per entry. Entries expire after
+# 7 days and the folder can be changed by setting CACHE_PATH
+CACHE_PATH = _default_cache_path()
+CACHE_EXPIRE = 7 * 86400
+
+# MEDLINE fields extracted for each article, with their continuation lines
+MEDLINE_FIELD_RE = re.compile(r'^(PMID|TI|AB|FAU|DP|MH|OT) *- (.*(?:\n {6}.*)*)',
+                              re.M)
+COLUMNS = ('pmid', 'ti', 'ab', 'fau', 'dp', 'mh', 'ot')
+
+# Columns also available in the ESummary document summaries
+SUMMARY_COLUMNS = ('pmid', 'ti', 'dp')
+
+# Number of articles in each DataFrame built by edirect_search
+CHUNK_SIZE = 5000
+
+# Patterns used to convert Windows paths to WSL format
+WIN_PATH_RE = re.compile(r'^(\w):\\')
+BACKSLASH_RE = re.compile(r'\\')
+
+def _medline_records(stream, size=1 << 20):
+    """
+    Reads MEDLINE text from a file object in chunks of `size` characters and
+    yields the text of each record as soon as it is complete. Records are
+    separated by blank lines, so each chunk is split at once instead of
+    scanning it line by line.
+    """
+    tail = ''
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        records = (tail + chunk).split('\n\n')
+        # The last piece may be an incomplete record
+        tail = records.pop()
+        yield from records
+    if tail.strip():
+        yield tail
+
+def _parse_medline(records, columns):
+    """
+    Parses MEDLINE records and appends the fields of each article to the lists
+    in `columns`, a dictionary with one list for each name in COLUMNS.
+    Repeatable fields (FAU, MH and OT) are stored as lists and the other
+    fields as strings with whitespace collapsed. Missing fields are stored as
+    empty strings.
+    """
+    for record in records:
+        fields = MEDLINE_FIELD_RE.findall(record)
+
+        # Every MEDLINE record starts with the PMID
+        if not fields or fields[0][0] != 'PMID':
+            continue
+
+        # Add an empty row, filled in place with the fields of the record
+        for column in COLUMNS:
+            columns[column].append('')
+
+        for key, value in fields:
+            value = ' '.join(value.split())
+            column = columns[key.lower()]
+            if key not in ('FAU', 'MH', 'OT'):
+                column[-1] = value
+            elif column[-1]:
+                column[-1].append(value)
+            else:
+                column[-1] = [value]
+
+def _parse_medline_batch(text):
+    """
+    Parses a batch of MEDLINE text and returns the extracted columns.
+    """
+    columns = {column: [] for column in COLUMNS}
+    _parse_medline(text.split('\n\n'), columns)
+    return columns
+
+def _parse_esummary_batch(text):
+    """
+    Parses a batch of ESummary JSON and returns the columns in
+    SUMMARY_COLUMNS, with the same values as in the MEDLINE format.
+    """
+    data = json.loads(text)
+    if 'result' not in data:
+        raise Exception(data.get('error', 'Invalid ESummary response.'))
+    result = data['result']
+    columns = {column: [] for column in SUMMARY_COLUMNS}
+    for uid in result['uids']:
+        summary = result[uid]
+        columns['pmid'].append(uid)
+        columns['ti'].append(' '.join(summary.get('title', '').split()))
+        columns['dp'].append(summary.get('pubdate', ''))
+    return columns
+
+def _medline_chunks(records, chunk_size=CHUNK_SIZE):
+    """
+    Parses MEDLINE records in chunks of `chunk_size` articles, yielding a
+    DataFrame for each chunk, so that the parsed fields of only one chunk are
+    kept as Python objects at a time.
+    """
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+        columns = {column: [] for column in COLUMNS}
+        _parse_medline(chunk, columns)
+        yield _to_dataframe(columns)
+
+def _to_dataframe(columns):
+    """
+    Builds the result DataFrame from the column lists filled by
+    _parse_medline or _parse_esummary_batch.
+    """
+    # pandas is imported here, as it is slow to import and only needed once
+    # the results are ready
+    import pandas as pd
+
+    result = pd.DataFrame(columns)
+    if 'pmid' in result:
+        result['pmid'] = result['pmid'].astype('int64')
+    return result
+
+def _cache_key(*parts):
+    """
+    Creates a cache key from the parts that identify a downloaded payload.
+    """
+    return hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()
+
+def _cache_file(key):
+    """
+    Returns the path of the cache entry stored under `key`.
+    """
+    return os.path.join(CACHE_PATH, key + '.cache')
+
+def _cache_open(key):
+    """
+    Opens the cache entry stored under `key` for reading, or returns None if
+    it is not cached, has expired or can't be read.
+    """
+    path = _cache_file(key)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_EXPIRE:
+            return None
+        return open(path, encoding='utf-8', newline='')
+    except OSError:
+        return None
+
+def _cache_get(key):
+    """
+    Returns the cached text stored under `key`, or None if it is not cached,
+    has expired or can't be read.
+    """
+    f = _cache_open(key)
+    if f is None:
+        return None
+    try:
+        with f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def _cache_set(key, text):
+    """
+    Stores `text` in the cache under `key`.
+    """
+    writer = _CacheWriter(key)
+    writer.write(text)
+    writer.commit()
+
+def _cache_records(records, writer):
+    """
+    Yields MEDLINE records while writing them to a new cache entry with
+    `writer`, separated by blank lines as in the EDirect output.
+    """
+    for record in records:
+        writer.write(record)
+        writer.write('\n\n')
+        yield record
+
+def _cache_prune():
+    """
+    Deletes the expired cache entries, including temporary files left by
+    interrupted downloads.
+    """
+    now = time.time()
+    try:
+        with os.scandir(CACHE_PATH) as entries:
+            for entry in entries:
+                if not entry.name.endswith(('.cache', '.tmp')):
+                    continue
+                try:
+                    if now - entry.stat().st_mtime > CACHE_EXPIRE:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+class _CacheWriter:
+    """
+    Writes a new cache entry to a temporary file that is moved into the cache
+    when `commit` is called, so that incomplete entries are never read. If
+    the cache folder can't be written, nothing is cached and no error is
+    raised.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.file = None
+        try:
+            os.makedirs(CACHE_PATH, exist_ok=True)
+            fd, self.path = tempfile.mkstemp(suffix='.tmp', dir=CACHE_PATH)
+            self.file = open(fd, 'w', encoding='utf-8', newline='')
+        except OSError:
+            pass
+
+    def write(self, text):
+        if self.file is None:
+            return
+        try:
+            self.file.write(text)
+        except OSError:
+            self.discard()
+
+    def commit(self):
+        if self.file is None:
+            return
+        try:
+            self.file.close()
+            os.replace(self.path, _cache_file(self.key))
+        except OSError:
+            self.discard()
+            return
+        self.file = None
+        _cache_prune()
+
+    def discard(self):
+        if self.file is None:
+            return
+        try:
+            self.file.close()
+            os.remove(self.path)
+        except OSError:
+            pass
+        self.file = None
+
+def _make_session():
+    """
+    Creates the HTTP session used for the E-utilities requests. The session
+    keeps the connections to the server open between requests and retries
+    failed requests with exponential backoff, waiting the time requested by
+    the server in the Retry-After header of HTTP 429 (Too Many Requests)
+    responses.
+    """
+    retries = Retry(total=5, backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20,
+                          max_retries=retries)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    return session
+
+SESSION = _make_session()
+
+# ESearch results by (term, api_key), reused while their WebEnv is still valid
+# on the NCBI history server (about 8 hours)
+ESEARCH_CACHE = {}
+ESEARCH_CACHE_SIZE = 256
+ESEARCH_TTL = 6 * 3600
+
+def _esearch(term, email='', api_key=None, use_cache=True):
+    """
+    Searches PubMed with the ESearch endpoint, storing the results on the NCBI
+    history server. Returns a dictionary with the 'count' of results and the
+    'webenv' and 'querykey' used to retrieve them with EFetch. If `use_cache`
+    is True, a result obtained for the same term and API key in the last 6
+    hours is returned without a new request.
+    """
+    key = (term, api_key)
+    entry = ESEARCH_CACHE.get(key)
+    if use_cache and entry is not None:
+        timestamp, search_results = entry
+        if time.monotonic() - timestamp < ESEARCH_TTL:
+            return search_results
+
+    params = {
+        'db': 'pubmed',
+        'term': term,
+        'usehistory': 'y',
+        'retmode': 'json',
+        'tool': 'pubmedtools',
+    }
+    if email:
+        params['email'] = email
+    if api_key:
+        params['api_key'] = api_key
+
+    _rate_limiter(api_key).wait()
+    resp = SESSION.get(ESEARCH_URL, params=params)
+    resp.raise_for_status()
+    search_results = resp.json()['esearchresult']
+    if 'ERROR' in search_results:
+        raise Exception(search_results['ERROR'])
+
+    # Discard the oldest result if the cache is full
+    ESEARCH_CACHE.pop(key, None)
+    if len(ESEARCH_CACHE) >= ESEARCH_CACHE_SIZE:
+        del ESEARCH_CACHE[next(iter(ESEARCH_CACHE))]
+    ESEARCH_CACHE[key] = (time.monotonic(), search_results)
+
+    return search_results
+
+def _get_batch(url, params):
+    """
+    Downloads a single batch of articles from an E-utilities endpoint, such as
+    EFetch or ESummary, and returns the response body as text. If NCBI reports
+    that the rate limit budget is exhausted, the next requests of all threads
+    wait for the next rate limit window.
+    """
+    resp = SESSION.get(url, params=params)
+    resp.raise_for_status()
+
+    # Responses without the header give no information about the budget
+    remaining = resp.headers.get('X-RateLimit-Remaining')
+    if remaining is not None and int(remaining) <= 1:
+        api_key = params.get('api_key')
+        _rate_limiter(api_key).pause(0.11 if api_key else 1.0)
+
+    # E-utilities always return UTF-8, so skip the character encoding
+    # detection
+    resp.encoding = 'utf-8'
+    return resp.text
+
+class _RateLimiter:
+    """
+    Spaces the requests of all threads at least 1/`rate` seconds apart, so
+    that no more than `rate` requests are sent in any second.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self.next = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """
+        Blocks until a request can be made without exceeding the rate limit,
+        and returns the monotonic time reserved for the request.
+        """
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next)
+            self.next = start + self.interval
+        time.sleep(start - now)
+        return start
+
+    def pause(self, delay):
+        """
+        Delays the next request of every thread to at least `delay` seconds
+        from now.
+        """
+        with self.lock:
+            self.next = max(self.next, time.monotonic() + delay)
+
+# Rate limiters shared by all the E-utilities requests of the process, by the
+# number of requests per second allowed by NCBI
+RATE_LIMITERS = {rate: _RateLimiter(rate) for rate in (3, 10)}
+
+def _rate_limiter(api_key=None):
+    """
+    Returns the shared rate limiter for requests made with or without an API
+    key: 10 requests per second with a key and 3 requests per second without.
+    """
+    return RATE_LIMITERS[10 if api_key else 3]
+
+def _fetch_one(limiter, url, params, count, verbose=True):
+    """
+    Downloads a single batch in a download thread, waiting for the rate
+    limiter before sending the request.
+    """
+    limiter.wait()
+    if verbose:
+        start = params['retstart']
+        print('Downloading %i-%i/%i'%(start,
+                                      min([start+params['retmax'], count]),
+                                      count))
+    return _get_batch(url, params)
+
 def biopython_search(term, email='', api_key=None, batch_size=1000,
-                            verbose=True):
+                            verbose=True, use_cache=True, fields=None):
     """
     Searches the PubMed database using a given term and retrieves the abstract,
     title, publication date, authors, MeSH terms, and other terms related to
-    each article. This function use the Bio.Entrez module from Biopython.
+    each article. This function use the NCBI E-utilities API directly.
     The search is limited to 10,000 results.
 
     Parameters
@@ -51,13 +467,25 @@ def biopython_search(term, email='', api_key=None, batch_size=1000,
         Number of articles to be downloaded per iteration. Default is 1000.
     verbose : bool, optional
         Whether to print progress messages. Default is True.
+    use_cache : bool, optional
+        Whether to reuse the search made with the same term in the last 6
+        hours of the session and the data downloaded for it in the last 7
+        days, and to store new downloads in the cache. Default is True.
+        The cache is kept in the folder set by the PUBMEDTOOLS_CACHE
+        environment variable, by default a pubmedtools folder in the user
+        cache folder (e.g. ~/.cache/pubmedtools on Linux).
+    fields : str or list of str, optional
+        Column or columns to be retrieved, among 'pmid', 'ti', 'ab', 'fau',
+        'dp', 'mh', and 'ot'. If only 'pmid', 'ti' and 'dp' are requested,
+        the much smaller document summaries (ESummary) are downloaded instead
+        of the full records. Default is all columns.
 
     Returns
     -------
     result : pandas.DataFrame
-        A DataFrame with columns 'pmid', 'ti', 'ab', 'fau', 'dp', 'mh', and 'ot'.
-        Each row contains information related to a single article retrieved
-        from the search term query.
+        A DataFrame with columns 'pmid', 'ti', 'ab', 'fau', 'dp', 'mh', and 'ot',
+        or the columns in `fields`. Each row contains information related to a
+        single article retrieved from the search term query.
 
     Raises
     ------
@@ -65,20 +493,36 @@ def biopython_search(term, email='', api_key=None, batch_size=1000,
         If the search returns more than 10,000 results, which is the limit of
         this function. In this case, the user should use the
         `pubmed_search_edirect` function.
+    ValueError
+        If `fields` is empty or contains an unknown column.
     """
 
-    Entrez.email = email
-    
-    if api_key:
-        Entrez.api_key = api_key
+    # Accept a single field name and remove repeated fields, which would
+    # repeat the rows of the result
+    if isinstance(fields, str):
+        fields = [fields]
+    fields = list(dict.fromkeys(COLUMNS if fields is None else fields))
+    if not fields:
+        raise ValueError('At least one field must be requested. '
+                         f"Available fields: {', '.join(COLUMNS)}.")
+    unknown = set(fields) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. "
+                         f"Available fields: {', '.join(COLUMNS)}.")
+
+    # Use the document summaries if they have all the requested fields
+    summary = set(fields) <= set(SUMMARY_COLUMNS)
+    if summary:
+        url, parse_batch = ESUMMARY_URL, _parse_esummary_batch
+    else:
+        url, parse_batch = EFETCH_URL, _parse_medline_batch
 
     if verbose:
         print(term)
 
     # ESearch to get webenv and query key
-    h = Entrez.esearch(db='pubmed', term=term, usehistory="y")
-    search_results = Entrez.read(h)
-    count = int(search_results['Count'])
+    search_results = _esearch(term, email, api_key, use_cache)
+    count = int(search_results['count'])
     
     if count > 10000:
         raise Exception(f"This search has {count} results. "
@@ -86,110 +530,102 @@ def biopython_search(term, email='', api_key=None, batch_size=1000,
                         "more than 10,000 results. "
                         "Use the pubmedtools.search.edirect_search function.")
     
-    r=[]
-
+    # Build the EFetch or ESummary parameters for each batch. For EFetch,
+    # MEDLINE text is requested rather than XML: it is about half the size to
+    # download and _parse_medline reads it faster than an XML parser reads
+    # the same articles
+    batches = []
     for start in range(0, count, batch_size):
-        if verbose:
-            print('Downloading %i-%i/%i'%(start, min([start+batch_size,count]),
-                                          count))
-
-        # EFetch to retrieve data for a given set of PMIDs
-        fetch_handle = Entrez.efetch(
-            db="pubmed",
-            rettype="medline",
-            retmode="text",
-            retstart=start,
-            retmax=batch_size,
-            webenv=search_results["WebEnv"],
-            query_key=search_results["QueryKey"],
-        )
-        
-        # Parsing the downloaded data in medline format
-        records_medline = Medline.parse(fetch_handle)
-        
-        for record in records_medline:
-            # Extracting the relevant fields for each article
-            ab = record.get('AB', '')
-            ab = re.sub('\s+',' ',ab)
-            ti = record.get('TI', '')
-            ti = re.sub('\s+',' ',ti)
-            pmid = record.get('PMID', '')
-            fau = record.get('FAU', '')
-            dp = record.get('DP', '')
-            mh = record.get('MH', '')
-            ot = record.get('OT', '')
-            
-            # Creating a dictionary with the relevant fields for each article
-            # and adding it to the list
-            row = {
-            'pmid': int(pmid),
-            'ti': ti,
-            'ab': ab,                 
-            'fau': fau,
-            'dp': dp,
-            'mh': mh,
-            'ot': ot,
-            }
-           
-            r.append(row)
-            
-        # If not all results have been downloaded, wait for 3 seconds before
-        # the next download,
-        # to avoid overloading the NCBI server
-        if (start+batch_size) < count:
-            time.sleep(3)    
+        if summary:
+            params = {'retmode': 'json'}
+        else:
+            params = {'rettype': 'medline', 'retmode': 'text'}
+        params.update({
+            'db': 'pubmed',
+            'retstart': start,
+            'retmax': batch_size,
+            'WebEnv': search_results['webenv'],
+            'query_key': search_results['querykey'],
+            'tool': 'pubmedtools',
+        })
+        if email:
+            params['email'] = email
+        if api_key:
+            params['api_key'] = api_key
+        batches.append(params)
+
+    # Get the batches already available in the cache
+    keys = [_cache_key(term, count, params['retstart'], batch_size,
+                       'esummary' if summary else 'efetch')
+            for params in batches]
+    texts = [None] * len(batches)
+    if use_cache:
+        texts = [_cache_get(key) for key in keys]
+    missing = [i for i, text in enumerate(texts) if text is None]
+
+    # Parse the cached batches first and the others as soon as they are
+    # downloaded. Parsing is done in this process: even 10,000 records take a
+    # fraction of a second, less than starting worker processes and pickling
+    # the batches to them would cost
+    parsed = [None] * len(batches)
+    for i in range(len(batches)):
+        if texts[i] is not None:
+            parsed[i] = parse_batch(texts[i])
+
+    if missing:
+        # Download the missing batches in parallel threads, respecting the
+        # NCBI rate limit of 3 requests per second (10 requests per second
+        # with an API key), and parse each batch as soon as it arrives
+        rate = 10 if api_key else 3
+        limiter = _rate_limiter(api_key)
+        downloader = ThreadPoolExecutor(max_workers=rate)
+        try:
+            futures = {downloader.submit(_fetch_one, limiter, url,
+                                         batches[i], count, verbose): i
+                       for i in missing}
+            for future in as_completed(futures):
+                i = futures[future]
+                texts[i] = future.result()
+                parsed[i] = parse_batch(texts[i])
+        finally:
+            # Do not start the remaining downloads if one has failed
+            downloader.shutdown(cancel_futures=True)
+
+    # Merge the requested columns of the batches in the order of the results
+    columns = {column: [] for column in fields}
+    for batch_columns in parsed:
+        for column in fields:
+            columns[column].extend(batch_columns[column])
+
+    if use_cache:
+        for i in missing:
+            _cache_set(keys[i], texts[i])
     
     print('Done!')
     
-    result = pd.DataFrame(data=r)
+    result = _to_dataframe(columns)
     return result
 
-def edirect_search(query, api_key=None):
+def _edirect_popen(query, api_key, edirect_path):
     """
-    Searches the PubMed database using a given term and retrieves the abstract,
-    title, publication date, authors, MeSH terms, and other terms related to
-    each article. This function use the official NCBI Entrez Direct tool.
-
-    Parameters
-    ----------
-    query : str
-        The query to be searched in PubMed.
-    api_key : str, optional
-        The NCBI API key. If not provided, the search will be performed without
-        the API key.
-
-    Returns
-    -------
-    result : pandas.DataFrame
-        A pandas DataFrame containing the search results.
-
-    Notes
-    -----
-    This function works with Linux and Windows systems using WSL (Windows
-    Subsystem for Linux).
-
-    Raises
-    ------
-    Exception
-        If the operating system is not recognized.
+    Starts the Entrez Direct commands that search PubMed and fetch the result
+    in MEDLINE format. Returns the process, whose output is read as it is
+    produced, and the command.
     """
-
-    edirect_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
-                                'edirect')
-
-    if not os.path.isdir(edirect_path):
-        raise ImportError(('The "edirect" folder was not found. Please run '
-                           'the "pubmedtools.prepenv.edirect_folder()" function '
-                           'to create it.'))
-
-    print('Downloading data from PubMed...')
+    # The result is downloaded in MEDLINE format and parsed in Python.
+    # Piping XML through xtract would parse it in a compiled binary, but
+    # the XML is about twice the size to download and the tab-delimited
+    # output of xtract drops the abstract section labels and the major
+    # MeSH topic markers
 
     # Check the operating system where the function is being executed
     if platform.system() == "Linux":
         # Define the command to execute the PubMed search
-        cmd = 'esearch -db pubmed -query "%s" | efetch -format medline' % query
+        cmd = ('esearch -db pubmed -query "%s" | '
+               'efetch -format medline') % query
 
-        # Define the PATH environment variable to include the "edirect" directory
+        # Define the PATH environment variable to include the "edirect"
+        # directory
         env = {'PATH': f'{edirect_path}:{os.environ["PATH"]}'}
 
         # Check if an NCBI API key has been provided
@@ -199,17 +635,16 @@ def edirect_search(query, api_key=None):
 
         print(cmd)
 
-        # Execute the command and capture the result as a string
-        medline_str = subprocess.check_output(cmd,
-                                              env=env,
-                                              shell=True).decode('utf-8')
+        # Execute the command, reading the result as it is produced
+        proc = subprocess.Popen(cmd, env=env, shell=True,
+                                stdout=subprocess.PIPE, encoding='utf-8',
+                                bufsize=1 << 20)
 
     elif platform.system() == "Windows":
         # Convert the "edirect" directory path to WSL format
-        edirect_path = re.sub('\\\\', '/', re.sub('^(\w)\:\\\\',
-                                                 lambda match: '/mnt/' + 
-                                                 match.group(1).lower() + 
-                                                 '/', edirect_path))
+        edirect_path = BACKSLASH_RE.sub('/', WIN_PATH_RE.sub(
+            lambda match: '/mnt/' + match.group(1).lower() + '/',
+            edirect_path))
 
         # Define the command to execute the PubMed search
         cmd = ('wsl {}/esearch -db pubmed -query "{}" | '
@@ -222,46 +657,140 @@ def edirect_search(query, api_key=None):
         # Check if an NCBI API key has been provided
         # If yes, add the NCBI_API_KEY environment variable to the command
         if api_key:
-            cmd = re.sub('wsl', f'wsl export NCBI_API_KEY={api_key};', cmd)
+            cmd = cmd.replace('wsl', f'wsl export NCBI_API_KEY={api_key};')
 
-        # Execute the command and capture the result as a string
-        medline_str = subprocess.check_output(cmd, shell=True).decode('utf-8')
+        # Execute the command, reading the result as it is produced
+        proc = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE,
+                                encoding='utf-8', bufsize=1 << 20)
 
     else:
         # Raise an error if the operating system is not recognized
         raise Exception('Unsupported operating system: {}'.format(
             platform.system()))
 
-    # Extract relevant data from the search result
-    medline_record = Medline.parse(StringIO(medline_str))
-    result = []
-    print('Extracting data...')
-    for record in medline_record:
-        ab = record.get('AB', '')
-        ti = record.get('TI', '')
-        pmid = record.get('PMID', '')
-        aut = record.get('FAU', '')
-        dp = record.get('DP', '')
-        mh = record.get('MH', '')
-        ot = record.get('OT', '')
-
-        # Store the relevant data in a dictionary
-        row = {
-            'pmid': int(pmid),
-            'ti': ti,
-            'ab': ab,
-            'fau': aut,
-            'dp': dp,
-            'mh': mh,
-            'ot': ot,
-        }
-        result.append(row)
-
-    # Create a DataFrame from the dictionary
+    return proc, cmd
+
+def edirect_search(query, api_key=None, use_cache=True, yield_chunks=False):
+    """
+    Searches the PubMed database using a given term and retrieves the abstract,
+    title, publication date, authors, MeSH terms, and other terms related to
+    each article. This function use the official NCBI Entrez Direct tool.
+
+    Parameters
+    ----------
+    query : str
+        The query to be searched in PubMed.
+    api_key : str, optional
+        The NCBI API key. If not provided, the search will be performed without
+        the API key.
+    use_cache : bool, optional
+        Whether to reuse data downloaded in the last 7 days for the same query
+        and to store new downloads in the cache. Default is True.
+        The cache is kept in the folder set by the PUBMEDTOOLS_CACHE
+        environment variable, by default a pubmedtools folder in the user
+        cache folder (e.g. ~/.cache/pubmedtools on Linux). A cached result
+        is returned without checking PubMed, so articles added in the last 7
+        days may be missing; use False to always download the current
+        result. Empty results are not cached.
+    yield_chunks : bool, optional
+        Whether to return a generator of DataFrames with up to 5,000 articles
+        each, produced while the results are downloaded, instead of a single
+        DataFrame. Useful to process or save very large results without
+        keeping all of them in memory. Default is False.
+
+    Returns
+    -------
+    result : pandas.DataFrame or generator of pandas.DataFrame
+        A pandas DataFrame containing the search results, or a generator of
+        DataFrames if `yield_chunks` is True.
+
+    Notes
+    -----
+    This function works with Linux and Windows systems using WSL (Windows
+    Subsystem for Linux).
+    Whitespace in the titles, abstracts and MeSH terms is collapsed to single
+    spaces, so the line breaks of long MEDLINE fields become a single space.
+
+    Raises
+    ------
+    Exception
+        If the operating system is not recognized.
+    """
+
+    edirect_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'edirect')
+
+    if not os.path.isdir(edirect_path):
+        raise ImportError(('The "edirect" folder was not found. Please run '
+                           'the "pubmedtools.prepenv.edirect_folder()" function '
+                           'to create it.'))
+
+    def extract():
+        # The cache is read and EDirect is started only when the generator
+        # runs, so that nothing is left open if it is never started
+        key = _cache_key('edirect', query)
+        cached = _cache_open(key) if use_cache else None
+        if cached is not None:
+            # Extract relevant data from the cached search result, one chunk
+            # at a time
+            print('Extracting data...')
+            with cached:
+                yield from _medline_chunks(_medline_records(cached))
+        else:
+            print('Downloading data from PubMed...')
+            proc, cmd = _edirect_popen(query, api_key, edirect_path)
+
+            # Extract relevant data from the search result, one chunk at a
+            # time, while it is read from EDirect
+            print('Extracting data...')
+
+            # Write the records to a new cache entry as they are read, so
+            # that the result is never held in memory as a whole
+            records = _medline_records(proc.stdout)
+            writer = _CacheWriter(key) if use_cache else None
+            if writer is not None:
+                records = _cache_records(records, writer)
+            try:
+                found = False
+                for chunk in _medline_chunks(records):
+                    found = True
+                    yield chunk
+
+                # Check if the command finished successfully
+                proc.stdout.close()
+                if proc.wait() != 0:
+                    raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+                # Empty results are not cached, so that the query is searched
+                # again until it finds articles
+                if writer is not None and found:
+                    writer.commit()
+            finally:
+                # Stop EDirect and drop the incomplete cache entry if the
+                # chunks were not all read or the command failed
+                if proc.poll() is None:
+                    proc.stdout.close()
+                    proc.kill()
+                    proc.wait()
+                if writer is not None:
+                    writer.discard()
+
+        if yield_chunks:
+            print('Done!')
+
+    if yield_chunks:
+        return extract()
+
+    # Create a DataFrame joining the chunks
+    frames = list(extract())
     print('Writing file...')
-    result = pd.DataFrame(data=result)
+    if frames:
+        import pandas as pd
+        result = pd.concat(frames, ignore_index=True)
+    else:
+        result = _to_dataframe({column: [] for column in COLUMNS})
 
     print('Done!')
 
     # Return the final result
-    return result
\ No newline at end of file
+    return result
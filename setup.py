@@ -6,12 +6,12 @@ setup(name='pubmedtools',
       author_email='diogomachado.bioinfo@gmail.com',
       description=('Pubmed Tools (pubmedtools) package provides functions for'
                    'searching and retrieving articles from the PubMed database'
-                   'using Biopython and NCBI Entrez Direct.'),
+                   'using the NCBI E-utilities API and NCBI Entrez Direct.'),
       packages=find_packages(),
       long_description_content_type='text/markdown',
       long_description=open('README.md').read(),
       zip_safe=False,
-      install_requires=['pandas', 'biopython'],
+      install_requires=['pandas', 'requests'],
       license = 'BSD-3-Clause',
       url='https://github.com/diogomachado-bioinfo/pubmedtools',
       )
@@ -0,0 +1,234 @@
+"""
+Tests for the MEDLINE parsing used by pubmedtools.search, checked against
+records in the format returned by PubMed EFetch and Entrez Direct.
+"""
+import json
+import os
+import threading
+import time
+from io import StringIO
+
+import pytest
+
+from pubmedtools import search
+from pubmedtools.search import (COLUMNS, EFETCH_URL, ESUMMARY_URL,
+                                _cache_get, _cache_set, _medline_chunks,
+                                _medline_records, _parse_esummary_batch,
+                                _parse_medline, _RateLimiter, biopython_search)
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data',
+                         'pubmed.medline')
+ESUMMARY_PATH = os.path.join(os.path.dirname(DATA_PATH), 'esummary.json')
+
+
+@pytest.fixture
+def medline_text():
+    with open(DATA_PATH, encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def esummary_text():
+    with open(ESUMMARY_PATH, encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def eutils(tmp_path, monkeypatch, medline_text, esummary_text):
+    # Replace the E-utilities requests with the fixtures and record the URLs
+    urls = []
+
+    def get_batch(url, params):
+        urls.append(url)
+        return esummary_text if url == ESUMMARY_URL else medline_text
+
+    monkeypatch.setattr(search, 'CACHE_PATH', str(tmp_path))
+    monkeypatch.setattr(search, 'RATE_LIMITERS',
+                        {rate: _RateLimiter(rate) for rate in (3, 10)})
+    monkeypatch.setattr(search, '_esearch', lambda *args: {
+        'count': '3', 'webenv': 'MCID_1', 'querykey': '1'})
+    monkeypatch.setattr(search, '_get_batch', get_batch)
+    return urls
+
+
+def parse(text):
+    columns = {column: [] for column in COLUMNS}
+    _parse_medline(text.split('\n\n'), columns)
+    return columns
+
+
+def test_matches_biopython(medline_text):
+    Medline = pytest.importorskip('Bio.Medline')
+    columns = parse(medline_text)
+    records = list(Medline.parse(StringIO(medline_text)))
+    assert columns['pmid'] == [record['PMID'] for record in records]
+    for i, record in enumerate(records):
+        # Whitespace in the text fields is collapsed to single spaces
+        for key in ('TI', 'AB', 'DP'):
+            assert columns[key.lower()][i] == ' '.join(record.get(key, '').split())
+        for key in ('FAU', 'MH', 'OT'):
+            assert columns[key.lower()][i] == record.get(key, '')
+
+
+def test_continuation_lines(medline_text):
+    columns = parse(medline_text)
+    assert columns['ti'][0] == ('BioBERT: a pre-trained biomedical language '
+                                'representation model for biomedical text '
+                                'mining.')
+    assert columns['ab'][0].startswith('MOTIVATION: Biomedical text mining '
+                                       'is becoming increasingly important')
+    assert 'researchers. RESULTS: We introduce' in columns['ab'][0]
+    assert columns['ab'][0].endswith('large-scale biomedical corpora.')
+    assert ('Publications/statistics & numerical data/*classification/'
+            'standards/ trends') in columns['mh'][0]
+
+
+def test_near_miss_tags(medline_text):
+    columns = parse(medline_text)
+    # OTO and MHDA must not be read as OT and MH
+    assert columns['ot'][0] == ['deep learning', 'text mining']
+    assert all('2020/03/13' not in term for term in columns['mh'][0])
+    assert columns['mh'][2] == ['Humans', 'Machine Learning']
+
+
+def test_missing_fields(medline_text):
+    columns = parse(medline_text)
+    assert columns['pmid'][1] == '35108013'
+    assert columns['ab'][1] == ''
+    assert columns['mh'][1] == ''
+    assert columns['ot'][1] == ''
+    assert columns['ot'][2] == ''
+
+
+def test_repeatable_fields(medline_text):
+    columns = parse(medline_text)
+    assert columns['fau'][0] == ['Lee, Jinhyuk', 'Yoon, Wonjin',
+                                 'Kim, Sungdong']
+    assert columns['fau'][1] == ['Machado, Diogo de J S']
+    assert len(columns['mh'][0]) == 5
+    assert columns['dp'] == ['2020 Feb 15', '2022 Feb 2', '2017 Oct 13']
+
+
+def test_record_without_pmid_is_skipped(medline_text):
+    records = medline_text.split('\n\n')
+    no_pmid = records[2].replace('PMID- 29028248\n', '')
+    columns = parse('\n\n'.join([records[0], no_pmid, records[1]]))
+    assert columns['pmid'] == ['31452104', '35108013']
+    assert all(len(columns[column]) == 2 for column in COLUMNS)
+
+
+@pytest.mark.parametrize('size', [1, 64, 1 << 20])
+def test_medline_records_across_chunks(medline_text, size):
+    records = list(_medline_records(StringIO(medline_text), size))
+    assert records == medline_text.split('\n\n')
+
+
+def test_medline_chunks(medline_text):
+    chunks = list(_medline_chunks(medline_text.split('\n\n'), chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert list(chunks[0].columns) == list(COLUMNS)
+    assert str(chunks[0]['pmid'].dtype) == 'int64'
+    assert chunks[1]['pmid'].tolist() == [29028248]
+
+
+def test_cache(tmp_path, monkeypatch, medline_text):
+    monkeypatch.setattr(search, 'CACHE_PATH', str(tmp_path / 'cache'))
+    assert _cache_get('key') is None
+    _cache_set('key', medline_text)
+    assert _cache_get('key') == medline_text
+    assert os.listdir(tmp_path / 'cache') == ['key.cache']
+
+
+def test_cache_prunes_expired_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(search, 'CACHE_PATH', str(tmp_path))
+    _cache_set('old', 'old text')
+    expired = time.time() - search.CACHE_EXPIRE - 1
+    os.utime(tmp_path / 'old.cache', (expired, expired))
+    (tmp_path / 'other.txt').write_text('not a cache entry')
+    os.utime(tmp_path / 'other.txt', (expired, expired))
+    assert _cache_get('old') is None
+    _cache_set('new', 'new text')
+    assert sorted(os.listdir(tmp_path)) == ['new.cache', 'other.txt']
+
+
+def test_unusable_cache_path(tmp_path, monkeypatch):
+    path = tmp_path / 'file'
+    path.write_text('')
+    monkeypatch.setattr(search, 'CACHE_PATH', str(path / 'cache'))
+    _cache_set('key', 'text')
+    assert _cache_get('key') is None
+
+
+@pytest.mark.parametrize('rate', [3, 10])
+def test_rate_limiter(rate):
+    limiter = _RateLimiter(rate)
+    starts = []
+    threads = [threading.Thread(target=lambda: starts.append(limiter.wait()))
+               for _ in range(2 * rate + 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    starts.sort()
+    # Requests are spaced 1/rate apart, so any second has at most rate
+    assert all(b - a >= 1 / rate - 1e-9 for a, b in zip(starts, starts[1:]))
+    assert sum(start < starts[0] + 1 - 1e-6 for start in starts) == rate
+    assert time.monotonic() >= starts[-1]
+
+
+def test_rate_limiter_pause():
+    limiter = _RateLimiter(10)
+    first = limiter.wait()
+    limiter.pause(0.5)
+    assert limiter.wait() - first >= 0.5
+
+
+def test_parse_esummary_batch(esummary_text, medline_text):
+    columns = _parse_esummary_batch(esummary_text)
+    assert columns['pmid'] == ['31452104', '35108013', '29028248']
+    assert columns['dp'] == ['2020 Feb 15', '2022 Feb 2', '2017 Oct 13']
+    # The values are the same as in the MEDLINE format
+    medline_columns = parse(medline_text)
+    for column in ('pmid', 'ti', 'dp'):
+        assert columns[column] == medline_columns[column]
+
+
+def test_parse_esummary_error():
+    text = json.dumps({'header': {'type': 'esummary', 'version': '0.3'},
+                       'error': 'Invalid uid 0 at position 0'})
+    with pytest.raises(Exception, match='Invalid uid 0 at position 0'):
+        _parse_esummary_batch(text)
+
+
+@pytest.mark.parametrize('fields, url', [
+    (['pmid', 'ti'], ESUMMARY_URL),
+    (['dp'], ESUMMARY_URL),
+    (['pmid', 'ab'], EFETCH_URL),
+    (None, EFETCH_URL),
+])
+def test_fields_endpoint(eutils, fields, url):
+    result = biopython_search('term', verbose=False, fields=fields)
+    assert eutils == [url]
+    assert list(result.columns) == list(fields or COLUMNS)
+    assert len(result) == 3
+
+
+def test_fields_single_name(eutils):
+    result = biopython_search('term', verbose=False, fields='ti')
+    assert list(result.columns) == ['ti']
+    assert result['ti'][2] == ('Text mining of PubMed abstracts with a '
+                               'single-line title.')
+
+
+def test_fields_repeated(eutils):
+    result = biopython_search('term', verbose=False,
+                              fields=['ti', 'pmid', 'ti'])
+    assert list(result.columns) == ['ti', 'pmid']
+    assert result['pmid'].tolist() == [31452104, 35108013, 29028248]
+
+
+@pytest.mark.parametrize('fields', [[], ['ti', 'journal']])
+def test_fields_invalid(eutils, fields):
+    with pytest.raises(ValueError):
+        biopython_search('term', verbose=False, fields=fields)
+    assert eutils == []